@@ -0,0 +1,552 @@
+"""
+Device & IP Fraud Analysis for SafePay
+Profiles devices, IP addresses and login patterns from UPI transaction
+logs to surface shared-device, shared-IP and account-takeover behaviour.
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # headless backend; skip GUI toolkit probing
+import matplotlib.pyplot as plt
+
+DATA_FILE = 'transactions.csv'
+
+# Optional numba: when installed the risk kernels run as parallel JIT
+# compiled loops fusing every clip/sum into one sweep; otherwise the
+# vectorized numpy fallbacks below are used unchanged.
+try:
+    from numba import njit, prange
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+# Optional polars: multithreaded Rust hash aggregation for the profile
+# builders; the pandas path stays the default and the fallback
+try:
+    import polars as pl
+    _POLARS_AVAILABLE = True
+except ImportError:
+    _POLARS_AVAILABLE = False
+
+# Optional duckdb: vectorized, multi-threaded, out-of-core SQL aggregation
+# straight off the CSV - the only engine here that handles logs larger
+# than RAM, since it never materializes the raw rows in Python
+try:
+    import duckdb
+    _DUCKDB_AVAILABLE = True
+except ImportError:
+    _DUCKDB_AVAILABLE = False
+
+# Shared risk binning: searchsorted returns 0/1/2 in one vectorized
+# binary-search pass, then fancy indexing maps straight to labels
+RISK_LABELS = np.array(['LOW', 'MEDIUM', 'HIGH'])
+RISK_BINS = np.array([3.0, 7.0])
+
+def risk_levels(scores):
+    """Map an array of risk scores to LOW/MEDIUM/HIGH labels"""
+    return RISK_LABELS[np.searchsorted(RISK_BINS, scores)]
+
+def compute_device_risk(unique_accounts, unique_ips, fraud_ratio, velocity):
+    """Device risk score from the aggregated profile columns"""
+    return (
+        np.clip(unique_accounts - 1, 0, 3) * 1.5
+        + np.clip(unique_ips - 1, 0, 3) * 1.0
+        + fraud_ratio * 5.0
+        + np.clip(velocity / 10.0, 0, 2)
+    )
+
+def compute_ip_risk(unique_accounts, unique_devices, fraud_ratio):
+    """IP risk score from the aggregated profile columns"""
+    return (
+        np.clip(unique_accounts - 1, None, 3) * 1.5
+        + np.clip(unique_devices - 1, None, 3) * 1.0
+        + fraud_ratio * 5.0
+    )
+
+if _NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def compute_device_risk(unique_accounts, unique_ips, fraud_ratio, velocity):  # noqa: F811
+        out = np.empty(unique_accounts.shape[0])
+        for i in prange(unique_accounts.shape[0]):
+            accounts = min(max(unique_accounts[i] - 1.0, 0.0), 3.0)
+            ips = min(max(unique_ips[i] - 1.0, 0.0), 3.0)
+            vel = min(max(velocity[i] / 10.0, 0.0), 2.0)
+            out[i] = accounts * 1.5 + ips * 1.0 + fraud_ratio[i] * 5.0 + vel
+        return out
+
+    @njit(parallel=True, cache=True)
+    def compute_ip_risk(unique_accounts, unique_devices, fraud_ratio):  # noqa: F811
+        out = np.empty(unique_accounts.shape[0])
+        for i in prange(unique_accounts.shape[0]):
+            accounts = min(unique_accounts[i] - 1.0, 3.0)
+            devices = min(unique_devices[i] - 1.0, 3.0)
+            out[i] = accounts * 1.5 + devices * 1.0 + fraud_ratio[i] * 5.0
+        return out
+
+class DeviceIPAnalyzer:
+    """Builds device and IP risk profiles from a transaction log"""
+
+    def __init__(self, data_file=DATA_FILE, engine='pandas'):
+        self.data_file = data_file
+        # 'polars' aggregates the profiles in multithreaded Rust; 'duckdb'
+        # streams the CSV through SQL without loading it into memory.
+        # Either silently falls back to pandas when not installed.
+        if engine == 'polars' and _POLARS_AVAILABLE:
+            self.engine = 'polars'
+        elif engine == 'duckdb' and _DUCKDB_AVAILABLE:
+            self.engine = 'duckdb'
+        else:
+            self.engine = 'pandas'
+        self.df = None
+        # Profiles live as aggregated DataFrames (one row per device/IP)
+        self.device_profiles = None
+        self.ip_profiles = None
+        self._uniques = {}
+        # One figure reused by both risk reports - created lazily so the
+        # analyzer stays cheap to pickle into worker processes
+        self._fig = None
+        self._ax = None
+
+    def load_data(self):
+        """Load the transaction log from CSV"""
+        # The analyses only touch these five columns; loading just them
+        # with an int8 fraud flag roughly halves bytes per row, and every
+        # downstream pass is memory-bandwidth-bound
+        read_kwargs = dict(
+            usecols=['DEVICE_ID', 'IP_ADDRESS', 'PAYER_ACCOUNT',
+                     'IS_FRAUD', 'TXN_TIMESTAMP'],
+            dtype={'IS_FRAUD': 'int8'},
+        )
+        try:
+            # pyarrow parses CSV multithreaded; fall back to the default
+            # C engine when it is not installed
+            self.df = pd.read_csv(self.data_file, engine='pyarrow', **read_kwargs)
+        except ImportError:
+            self.df = pd.read_csv(self.data_file, **read_kwargs)
+        # Fixed format skips per-row format inference; cache=True hashes
+        # each distinct timestamp string once (txn logs repeat heavily)
+        self.df['TXN_TIMESTAMP'] = pd.to_datetime(
+            self.df['TXN_TIMESTAMP'], format='%d/%m/%Y %H:%M', cache=True)
+
+        # Factorize the high-cardinality string keys once so every
+        # downstream groupby/nunique hashes int64 codes instead of
+        # variable-length strings. Plain int codes, not Categorical -
+        # categorical group keys degrade badly at high cardinality.
+        for col in ('DEVICE_ID', 'IP_ADDRESS', 'PAYER_ACCOUNT'):
+            codes, uniques = pd.factorize(self.df[col], sort=False)
+            self.df[col + '_CODE'] = codes
+            self._uniques[col] = uniques
+
+        return self.df
+
+    def _polars_profile_agg(self, key, account_col, other_col,
+                            account_name, other_name, with_time_range=False):
+        """Aggregate one profile frame through polars' lazy engine.
+
+        Groupby, distinct counts, fraud totals and the sample accounts
+        are fused into one multithreaded Rust query; only the small
+        aggregated table is converted back to pandas for scoring.
+        """
+        cols = [key, account_col, other_col, 'IS_FRAUD', 'TXN_TIMESTAMP']
+        exprs = [
+            pl.len().alias('transaction_count'),
+            pl.col('IS_FRAUD').sum().alias('fraud_count'),
+            pl.col(account_col).n_unique().alias(account_name),
+            pl.col(other_col).n_unique().alias(other_name),
+            pl.col(account_col).unique(maintain_order=True).head(3)
+              .alias('sample_accounts'),
+        ]
+        if with_time_range:
+            exprs += [
+                pl.col('TXN_TIMESTAMP').min().alias('tmin'),
+                pl.col('TXN_TIMESTAMP').max().alias('tmax'),
+            ]
+
+        agg = (pl.from_pandas(self.df[cols]).lazy()
+               .group_by(key)
+               .agg(exprs)
+               .collect())
+
+        agg_df = agg.to_pandas().set_index(key)
+        agg_df['sample_accounts'] = [list(s) for s in agg_df['sample_accounts']]
+        return agg_df
+
+    def _duckdb_profile_agg(self, key, account_col, other_col,
+                            account_name, other_name, with_time_range=False):
+        """Aggregate one profile frame with DuckDB SQL over the raw CSV.
+
+        read_csv_auto streams the file, so the raw rows never enter
+        Python; the parallel hash aggregator emits only the small
+        per-device/per-IP table, which makes this the engine of choice
+        for logs that do not fit in memory.
+        """
+        time_cols = ''
+        if with_time_range:
+            time_cols = (
+                ", MIN(strptime(TXN_TIMESTAMP, '%d/%m/%Y %H:%M')) AS tmin"
+                ", MAX(strptime(TXN_TIMESTAMP, '%d/%m/%Y %H:%M')) AS tmax"
+            )
+        query = (
+            f"SELECT {key},"
+            f" COUNT(*) AS transaction_count,"
+            f" SUM(IS_FRAUD) AS fraud_count,"
+            f" COUNT(DISTINCT {account_col}) AS {account_name},"
+            f" COUNT(DISTINCT {other_col}) AS {other_name},"
+            f" list_slice(list(DISTINCT {account_col}), 1, 3) AS sample_accounts"
+            f"{time_cols}"
+            f" FROM read_csv_auto(?)"
+            f" GROUP BY {key}"
+        )
+        agg_df = duckdb.execute(query, [self.data_file]).df().set_index(key)
+        agg_df['sample_accounts'] = [list(s) for s in agg_df['sample_accounts']]
+        return agg_df
+
+    def build_device_profiles(self):
+        """Profile every device with a single vectorized aggregation.
+
+        One groupby covers counts, distinct accounts/IPs, fraud totals and
+        the first/last transaction time; the ratios, velocity and risk
+        scores are then computed as whole-column NumPy expressions. This
+        replaces the old one-boolean-mask-per-device pattern, which did an
+        O(N) scan for each of D devices.
+        """
+        if self.engine == 'polars':
+            agg_df = self._polars_profile_agg('DEVICE_ID', 'PAYER_ACCOUNT',
+                                              'IP_ADDRESS', 'unique_accounts',
+                                              'unique_ips', with_time_range=True)
+            return self._finish_device_profiles(agg_df)
+        if self.engine == 'duckdb':
+            agg_df = self._duckdb_profile_agg('DEVICE_ID', 'PAYER_ACCOUNT',
+                                              'IP_ADDRESS', 'unique_accounts',
+                                              'unique_ips', with_time_range=True)
+            return self._finish_device_profiles(agg_df)
+
+        gb = self.df.groupby('DEVICE_ID_CODE', sort=False)
+        device_labels = self._uniques['DEVICE_ID']
+        agg_df = gb.agg(
+            transaction_count=('DEVICE_ID_CODE', 'size'),
+            fraud_count=('IS_FRAUD', 'sum'),
+            tmin=('TXN_TIMESTAMP', 'min'),
+            tmax=('TXN_TIMESTAMP', 'max'),
+        )
+        # Distinct counts via one dedup pass + size(); per-group nunique
+        # rebuilds a hash table inside every group and is much slower
+        agg_df['unique_accounts'] = (
+            self.df[['DEVICE_ID_CODE', 'PAYER_ACCOUNT_CODE']].drop_duplicates()
+            .groupby('DEVICE_ID_CODE', sort=False).size())
+        agg_df['unique_ips'] = (
+            self.df[['DEVICE_ID_CODE', 'IP_ADDRESS_CODE']].drop_duplicates()
+            .groupby('DEVICE_ID_CODE', sort=False).size())
+        # Up to three sample accounts per device, computed once here so
+        # anomaly reporting never revisits the transaction rows
+        dedup = self.df[['DEVICE_ID_CODE', 'PAYER_ACCOUNT']].drop_duplicates()
+        agg_df['sample_accounts'] = (
+            dedup.groupby('DEVICE_ID_CODE', sort=False).head(3)
+            .groupby('DEVICE_ID_CODE', sort=False)['PAYER_ACCOUNT'].agg(list))
+        # Map the int codes back to device ids only for the final profiles
+        agg_df.index = device_labels[agg_df.index]
+        return self._finish_device_profiles(agg_df)
+
+    def _finish_device_profiles(self, agg_df):
+        """Score an aggregated device frame and publish the profiles"""
+        txn_count = agg_df['transaction_count'].values
+        fraud_ratio = (agg_df['fraud_count'].values / txn_count).astype(np.float64)
+
+        # Single-transaction devices (often the majority) are fully
+        # determined: one account, one IP, zero velocity - only the fraud
+        # term can contribute. Skip the datetime math for all of them.
+        singleton = txn_count == 1
+        multi = ~singleton
+
+        time_range_hr = np.zeros(len(agg_df))
+        velocity = np.zeros(len(agg_df))
+        risk_score = fraud_ratio * 5.0
+
+        if multi.any():
+            # Plain datetime64 subtraction then one divide by an hour
+            # unit - still a single vectorized pass with no per-row
+            # total_seconds(), but resolution-agnostic: DuckDB returns
+            # microsecond timestamps (and pandas 3 defaults to them),
+            # where a hardcoded nanosecond divisor is off by 1000x
+            delta = (agg_df['tmax'].values[multi]
+                     - agg_df['tmin'].values[multi])
+            time_range_hr[multi] = delta / np.timedelta64(1, 'h')
+            velocity[multi] = np.where(
+                time_range_hr[multi] > 0,
+                txn_count[multi] / np.where(time_range_hr[multi] > 0,
+                                            time_range_hr[multi], 1),
+                0.0)
+
+            # Many accounts or IPs on one handset, any confirmed fraud, and
+            # high transaction velocity all push the score up
+            risk_score[multi] = compute_device_risk(
+                agg_df['unique_accounts'].values[multi].astype(np.float64),
+                agg_df['unique_ips'].values[multi].astype(np.float64),
+                fraud_ratio[multi],
+                velocity[multi],
+            )
+        risk_level = risk_levels(risk_score)
+
+        agg_df['fraud_ratio'] = fraud_ratio
+        agg_df['time_range_hr'] = time_range_hr
+        agg_df['velocity'] = velocity
+        agg_df['risk_score'] = risk_score
+        agg_df['risk_level'] = risk_level
+
+        # Kept as a columnar frame: anomaly detection and reporting scan
+        # contiguous ndarrays instead of a Python dict of dicts
+        self.device_profiles = agg_df
+        return self.device_profiles
+
+    def build_ip_profiles(self):
+        """Profile every IP address with a single vectorized aggregation.
+
+        Mirrors build_device_profiles: one groupby over the whole log
+        instead of a boolean-mask scan per IP, then whole-column NumPy
+        expressions for the ratio and score, and pd.cut for the level.
+        """
+        if self.engine == 'polars':
+            agg_df = self._polars_profile_agg('IP_ADDRESS', 'PAYER_ACCOUNT',
+                                              'DEVICE_ID', 'unique_accounts',
+                                              'unique_devices')
+            return self._finish_ip_profiles(agg_df)
+        if self.engine == 'duckdb':
+            agg_df = self._duckdb_profile_agg('IP_ADDRESS', 'PAYER_ACCOUNT',
+                                              'DEVICE_ID', 'unique_accounts',
+                                              'unique_devices')
+            return self._finish_ip_profiles(agg_df)
+
+        gb = self.df.groupby('IP_ADDRESS_CODE', sort=False)
+        ip_labels = self._uniques['IP_ADDRESS']
+        agg_df = gb.agg(
+            transaction_count=('IP_ADDRESS_CODE', 'size'),
+            fraud_count=('IS_FRAUD', 'sum'),
+        )
+        agg_df['unique_accounts'] = (
+            self.df[['IP_ADDRESS_CODE', 'PAYER_ACCOUNT_CODE']].drop_duplicates()
+            .groupby('IP_ADDRESS_CODE', sort=False).size())
+        agg_df['unique_devices'] = (
+            self.df[['IP_ADDRESS_CODE', 'DEVICE_ID_CODE']].drop_duplicates()
+            .groupby('IP_ADDRESS_CODE', sort=False).size())
+        dedup = self.df[['IP_ADDRESS_CODE', 'PAYER_ACCOUNT']].drop_duplicates()
+        agg_df['sample_accounts'] = (
+            dedup.groupby('IP_ADDRESS_CODE', sort=False).head(3)
+            .groupby('IP_ADDRESS_CODE', sort=False)['PAYER_ACCOUNT'].agg(list))
+        agg_df.index = ip_labels[agg_df.index]
+        return self._finish_ip_profiles(agg_df)
+
+    def _finish_ip_profiles(self, agg_df):
+        """Score an aggregated IP frame and publish the profiles"""
+        txn_count = agg_df['transaction_count'].values
+        fraud_ratio = (agg_df['fraud_count'].values / txn_count).astype(np.float64)
+
+        # As with devices, singleton IPs collapse to the fraud term alone
+        multi = txn_count > 1
+        risk_score = fraud_ratio * 5.0
+        if multi.any():
+            risk_score[multi] = compute_ip_risk(
+                agg_df['unique_accounts'].values[multi].astype(np.float64),
+                agg_df['unique_devices'].values[multi].astype(np.float64),
+                fraud_ratio[multi],
+            )
+
+        agg_df['fraud_ratio'] = fraud_ratio
+        agg_df['risk_score'] = risk_score
+        agg_df['risk_level'] = risk_levels(risk_score)
+
+        self.ip_profiles = agg_df
+        return self.ip_profiles
+
+    def get_device_profile(self, device):
+        """Return one device profile as a dict, or None if unknown"""
+        if self.device_profiles is None or device not in self.device_profiles.index:
+            return None
+        return self.device_profiles.loc[device].to_dict()
+
+    def get_ip_profile(self, ip):
+        """Return one IP profile as a dict, or None if unknown"""
+        if self.ip_profiles is None or ip not in self.ip_profiles.index:
+            return None
+        return self.ip_profiles.loc[ip].to_dict()
+
+    def analyze_login_patterns(self):
+        """Find accounts that log in from many device/IP combinations"""
+        # One hashed dedup in C replaces per-account Python set building:
+        # distinct (account, device, ip) rows, then a cheap size() per account
+        uniq = self.df[['PAYER_ACCOUNT_CODE', 'DEVICE_ID_CODE',
+                        'IP_ADDRESS_CODE']].drop_duplicates()
+
+        # The factorized account codes are dense 0..n-1 ints, so bincount
+        # replaces both groupby().size() calls with plain C counting
+        # loops - no hash table, no intermediate Series
+        account_labels = self._uniques['PAYER_ACCOUNT']
+        n_accounts = len(account_labels)
+        combo_counts = np.bincount(uniq['PAYER_ACCOUNT_CODE'].to_numpy(),
+                                   minlength=n_accounts)
+        login_counts = np.bincount(self.df['PAYER_ACCOUNT_CODE'].to_numpy(),
+                                   minlength=n_accounts)
+
+        suspicious_codes = np.nonzero(combo_counts > 3)[0]
+        return {
+            account_labels[code]: {
+                'combinations': int(combo_counts[code]),
+                'logins': int(login_counts[code]),
+            }
+            for code in suspicious_codes
+        }
+
+    def detect_rapid_device_switching(self, window_hours=24):
+        """Find accounts that hop between devices within a short window.
+
+        One sort of the whole frame plus groupby().shift() exposes every
+        consecutive (previous, current) pair at once; a boolean mask then
+        selects the switching events in a single vectorized pass instead
+        of a Python loop per account.
+        """
+        df = self.df.sort_values(['PAYER_ACCOUNT_CODE', 'TXN_TIMESTAMP'])
+        gb = df.groupby('PAYER_ACCOUNT_CODE', sort=False)
+
+        # Compare the int codes - much cheaper than string equality
+        prev_code = gb['DEVICE_ID_CODE'].shift(1)
+        prev_ts = gb['TXN_TIMESTAMP'].shift(1)
+        hours = (df['TXN_TIMESTAMP'] - prev_ts).dt.total_seconds() / 3600
+
+        mask = (prev_code.notna()
+                & (df['DEVICE_ID_CODE'] != prev_code)
+                & (hours < window_hours))
+
+        switched = df.loc[mask]
+        prev_device = self._uniques['DEVICE_ID'][prev_code[mask].astype(np.int64).values]
+        return [
+            {
+                'account': account,
+                'previous_device': previous,
+                'new_device': new,
+                'hours_between': float(h),
+                'timestamp': ts,
+                'is_fraud': int(fraud),
+            }
+            for account, previous, new, h, ts, fraud in zip(
+                switched['PAYER_ACCOUNT'].values,
+                prev_device,
+                switched['DEVICE_ID'].values,
+                hours[mask].values,
+                switched['TXN_TIMESTAMP'].values,
+                switched['IS_FRAUD'].values,
+            )
+        ]
+
+    def detect_device_anomalies(self):
+        """Flag devices whose profile looks like mule/shared-device activity"""
+        # One vectorized boolean filter over the columnar profile frame
+        # replaces the old per-device Python loop
+        profiles = self.device_profiles
+        mask = (profiles['risk_score'] > 3) & (
+            (profiles['unique_accounts'] > 2)
+            | (profiles['unique_ips'] > 2)
+            | (profiles['fraud_ratio'] > 0.1)
+            | (profiles['velocity'] > 5)
+        )
+        flagged = profiles.loc[mask, ['risk_score', 'risk_level',
+                                      'unique_accounts', 'fraud_ratio',
+                                      'sample_accounts']]
+        flagged = flagged.sort_values('risk_score', ascending=False)
+        return [{'device': device, **row}
+                for device, row in zip(flagged.index,
+                                       flagged.to_dict('records'))]
+
+    def detect_ip_anomalies(self):
+        """Flag IP addresses shared by many accounts or devices"""
+        profiles = self.ip_profiles
+        mask = (profiles['risk_score'] > 3) & (
+            (profiles['unique_accounts'] > 2)
+            | (profiles['unique_devices'] > 2)
+            | (profiles['fraud_ratio'] > 0.1)
+        )
+        flagged = profiles.loc[mask, ['risk_score', 'risk_level',
+                                      'unique_accounts', 'fraud_ratio',
+                                      'sample_accounts']]
+        flagged = flagged.sort_values('risk_score', ascending=False)
+        return [{'ip': ip, **row}
+                for ip, row in zip(flagged.index, flagged.to_dict('records'))]
+
+    def _plot_histogram(self, scores, title, ylabel, output_file):
+        """Render a risk histogram reusing the shared figure.
+
+        The bins are precomputed with np.histogram and drawn via ax.bar,
+        so matplotlib neither allocates a new figure nor re-derives the
+        bin edges itself.
+        """
+        if self._fig is None:
+            self._fig, self._ax = plt.subplots(figsize=(10, 6))
+        counts, edges = np.histogram(np.asarray(scores, dtype=np.float64), bins=20)
+        self._ax.clear()
+        self._ax.bar(edges[:-1], counts, width=np.diff(edges),
+                     align='edge', edgecolor='black')
+        self._ax.set_title(title)
+        self._ax.set_xlabel('Risk Score')
+        self._ax.set_ylabel(ylabel)
+        self._fig.savefig(output_file)
+
+    def generate_device_risk_report(self, output_file='device_risk_report.png'):
+        """Plot the device risk distribution and return high-risk devices"""
+        # Only the top entries are ever reported; DataFrame.nlargest is a
+        # partial select over the contiguous score column, not a full sort
+        profiles = self.device_profiles
+        high_risk = (profiles[profiles['risk_level'] == 'HIGH']
+                     .nlargest(50, 'risk_score').to_dict('index'))
+
+        self._plot_histogram(profiles['risk_score'].values,
+                             'Device Risk Score Distribution',
+                             'Devices', output_file)
+        return high_risk
+
+    def generate_ip_risk_report(self, output_file='ip_risk_report.png'):
+        """Plot the IP risk distribution and return high-risk IPs"""
+        profiles = self.ip_profiles
+        high_risk = (profiles[profiles['risk_level'] == 'HIGH']
+                     .nlargest(50, 'risk_score').to_dict('index'))
+
+        self._plot_histogram(profiles['risk_score'].values,
+                             'IP Risk Score Distribution',
+                             'IP Addresses', output_file)
+        return high_risk
+
+def main():
+    """Run the full device/IP analysis and print a summary"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    analyzer = DeviceIPAnalyzer()
+    analyzer.load_data()
+    print(f"Loaded {len(analyzer.df)} transactions")
+
+    # The four analyses are independent reads over the same frame, so
+    # fan them out across cores; shipping the pickled frame to each
+    # worker is cheap next to the aggregation work itself
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        device_future = executor.submit(analyzer.build_device_profiles)
+        ip_future = executor.submit(analyzer.build_ip_profiles)
+        login_future = executor.submit(analyzer.analyze_login_patterns)
+        switching_future = executor.submit(analyzer.detect_rapid_device_switching)
+
+        analyzer.device_profiles = device_future.result()
+        analyzer.ip_profiles = ip_future.result()
+        suspicious_accounts = login_future.result()
+        switching_events = switching_future.result()
+
+    print(f"Profiled {len(analyzer.device_profiles)} devices "
+          f"and {len(analyzer.ip_profiles)} IP addresses")
+    print(f"Suspicious login patterns: {len(suspicious_accounts)} accounts")
+    print(f"Rapid device switching events: {len(switching_events)}")
+
+    device_anomalies = analyzer.detect_device_anomalies()
+    ip_anomalies = analyzer.detect_ip_anomalies()
+    print(f"Device anomalies: {len(device_anomalies)}, IP anomalies: {len(ip_anomalies)}")
+
+    high_risk_devices = analyzer.generate_device_risk_report()
+    high_risk_ips = analyzer.generate_ip_risk_report()
+    print(f"High-risk devices: {len(high_risk_devices)}, high-risk IPs: {len(high_risk_ips)}")
+
+if __name__ == '__main__':
+    main()
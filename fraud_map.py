@@ -1,12 +1,17 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import folium
 from folium.plugins import HeatMap
-from streamlit_folium import folium_static
+import streamlit.components.v1 as components
+import pydeck as pdk
+import geopy.adapters
 from geopy.geocoders import Nominatim
+from diskcache import Cache
+from functools import lru_cache
 from datetime import datetime
+import csv
 import os
-import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
 import io
@@ -58,24 +63,55 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def load_data():
-    """Load scam data from CSV file"""
+@st.cache_data(show_spinner=False)
+def _load_data_cached(mtime_key):
+    """Read and parse the CSV; cached until the files change on disk"""
     try:
+        # dtype hints skip pandas' inference pass, and parsing the dates
+        # during the read avoids a second pass over the column
+        read_kwargs = dict(
+            dtype={'Scam Cases': 'int32',
+                   'Latitude': 'float64', 'Longitude': 'float64'},
+            parse_dates=['Last Reported Date'],
+            date_format='%Y-%m-%d',
+        )
         # First try to load the enhanced dataset with scam type information
         try:
-            df = pd.read_csv('updated_scam_data.csv')
+            df = pd.read_csv('updated_scam_data.csv', **read_kwargs)
             has_scam_types = True
         except:
             # If it's not available, load the original dataset
-            df = pd.read_csv('scam_data.csv')
+            df = pd.read_csv('scam_data.csv', **read_kwargs)
             has_scam_types = False
-        
-        df['Last Reported Date'] = pd.to_datetime(df['Last Reported Date'])
+
+        # Category dtype stores each distinct city/state string once and
+        # turns .isin filtering into integer-code compares
+        df['City'] = df['City'].astype('category')
+        df['State'] = df['State'].astype('category')
+
+        # Classify risk once at load time; every consumer (map markers,
+        # filters, the city panel) reads the column instead of redoing
+        # the threshold comparisons
+        df['Risk'] = pd.cut(df['Scam Cases'], bins=[-1, 200, 400, np.inf],
+                            labels=['Low Risk', 'Medium Risk', 'High Risk'])
+
         return df, has_scam_types
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return pd.DataFrame(), False
 
+def load_data():
+    """Load scam data from CSV file.
+
+    Every widget interaction reruns the whole script; keying the cached
+    read on the file mtimes means the CSV is only reparsed when
+    add_new_city actually rewrites it.
+    """
+    mtime_key = tuple(
+        os.path.getmtime(path) if os.path.exists(path) else 0
+        for path in ('updated_scam_data.csv', 'scam_data.csv'))
+    return _load_data_cached(mtime_key)
+
 def generate_map(df, center_lat=20.5937, center_lng=78.9629, zoom=5, search_city=None):
     """Generate an interactive map with scam data"""
     # Create the base map centered on India
@@ -88,8 +124,26 @@ def generate_map(df, center_lat=20.5937, center_lng=78.9629, zoom=5, search_city
     '''
     m.get_root().html.add_child(folium.Element(title_html))
     
-    # Prepare data for heatmap
-    heat_data = [[row['Latitude'], row['Longitude'], row['Scam Cases']] for _, row in df.iterrows()]
+    # Prepare data for heatmap - one C-level copy instead of a Python
+    # Series per row via iterrows. Past a few thousand points, folium's
+    # per-point JSON serialization dominates, so pre-aggregate onto a
+    # grid and emit only the non-empty cells; visual density is
+    # preserved while the payload shrinks by orders of magnitude. The
+    # grid tracks the zoom level: zoomed-out views can't resolve fine
+    # cells anyway, so they ship far fewer points.
+    if len(df) > 2000:
+        bins = min(400, 40 * max(zoom, 1))
+        weights, lat_edges, lon_edges = np.histogram2d(
+            df['Latitude'].to_numpy(), df['Longitude'].to_numpy(),
+            bins=bins, weights=df['Scam Cases'].to_numpy(dtype=np.float64))
+        lat_idx, lon_idx = np.nonzero(weights)
+        heat_data = np.column_stack([
+            (lat_edges[lat_idx] + lat_edges[lat_idx + 1]) / 2,
+            (lon_edges[lon_idx] + lon_edges[lon_idx + 1]) / 2,
+            weights[lat_idx, lon_idx],
+        ]).tolist()
+    else:
+        heat_data = df[['Latitude', 'Longitude', 'Scam Cases']].to_numpy().tolist()
     
     # Add heatmap layer
     HeatMap(heat_data, 
@@ -97,38 +151,50 @@ def generate_map(df, center_lat=20.5937, center_lng=78.9629, zoom=5, search_city
             gradient={0.2: 'blue', 0.4: 'lime', 0.6: 'yellow', 0.8: 'orange', 1: 'red'},
             min_opacity=0.5).add_to(m)
     
-    # Add circle markers for each city
-    for _, row in df.iterrows():
-        # Determine marker color based on scam cases
-        if row['Scam Cases'] > 400:
-            color = 'red'
-            risk = 'High Risk'
-        elif row['Scam Cases'] > 200:
-            color = 'orange'
-            risk = 'Medium Risk'
-        else:
-            color = 'green'
-            risk = 'Low Risk'
-        
-        # Create popup with city information
-        popup_content = f"""
-        <div style="width: 200px">
-            <h4 style="color: #5164BF;">{row['City']}, {row['State']}</h4>
-            <p><b>Scam Cases:</b> {row['Scam Cases']}</p>
-            <p><b>Risk Level:</b> <span style="color:{color};">{risk}</span></p>
-            <p><b>Last Reported:</b> {row['Last Reported Date'].strftime('%d %b %Y')}</p>
-        </div>
-        """
-        
-        # Add marker to map
-        folium.CircleMarker(
-            location=[row['Latitude'], row['Longitude']],
-            radius=max(5, row['Scam Cases'] / 50),
-            color=color,
-            fill=True,
-            fill_opacity=0.7,
-            popup=folium.Popup(popup_content, max_width=300)
-        ).add_to(m)
+    # Risk is classified once at load time; colors index straight off the
+    # category codes (0=Low, 1=Medium, 2=High)
+    cases = df['Scam Cases'].to_numpy()
+    risks = df['Risk'].astype(str).to_numpy()
+    colors = np.array(['green', 'orange', 'red'])[df['Risk'].cat.codes]
+    radii = np.maximum(5, cases / 50)
+
+    # One GeoJson layer replaces a CircleMarker object per city: folium
+    # serializes a single FeatureCollection and Leaflet ingests it in
+    # bulk, instead of N Python marker objects each carrying an inline
+    # HTML popup string. Dates are formatted in one vectorized pass.
+    dates = df['Last Reported Date'].dt.strftime('%d %b %Y').tolist()
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [lng, lat]},
+            'properties': {
+                'city': city,
+                'state': state,
+                'cases': case,
+                'risk': risk,
+                'color': color,
+                'radius': radius,
+                'last_reported': date,
+            },
+        }
+        for lat, lng, city, state, case, risk, color, radius, date in zip(
+            df['Latitude'].tolist(), df['Longitude'].tolist(),
+            df['City'].tolist(), df['State'].tolist(), cases.tolist(),
+            risks.tolist(), colors.tolist(), radii.tolist(), dates)
+    ]
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features},
+        marker=folium.CircleMarker(fill=True, fill_opacity=0.7),
+        style_function=lambda feature: {
+            'color': feature['properties']['color'],
+            'radius': feature['properties']['radius'],
+        },
+        popup=folium.GeoJsonPopup(
+            fields=['city', 'state', 'cases', 'risk', 'last_reported'],
+            aliases=['City', 'State', 'Scam Cases', 'Risk Level',
+                     'Last Reported'],
+        ),
+    ).add_to(m)
     
     # If a search city is specified, highlight it
     if search_city:
@@ -141,64 +207,160 @@ def generate_map(df, center_lat=20.5937, center_lng=78.9629, zoom=5, search_city
     
     return m
 
+@st.cache_data(show_spinner=False)
+def render_map_html(df, center_lat=20.5937, center_lng=78.9629, zoom=5,
+                    search_city=None):
+    """Build the map and render it to HTML, cached per input combination.
+
+    Streamlit reruns the whole script on any widget change; caching the
+    rendered HTML means the folium map is only rebuilt when the filtered
+    data or view actually changes.
+    """
+    m = generate_map(df, center_lat=center_lat, center_lng=center_lng,
+                     zoom=zoom, search_city=search_city)
+    return m.get_root().render()
+
+def generate_deck(df, center_lat=20.5937, center_lng=78.9629, zoom=4):
+    """WebGL alternative to the folium map.
+
+    pydeck renders the heat layer on the client GPU, so the Python side
+    only ships the raw columns instead of building HTML for every point.
+    """
+    data = df[['Longitude', 'Latitude', 'Scam Cases', 'City']].rename(
+        columns={'Scam Cases': 'ScamCases'})
+    heat_layer = pdk.Layer(
+        'HeatmapLayer',
+        data=data,
+        get_position=['Longitude', 'Latitude'],
+        get_weight='ScamCases',
+    )
+    marker_layer = pdk.Layer(
+        'ScatterplotLayer',
+        data=data,
+        get_position=['Longitude', 'Latitude'],
+        get_radius='ScamCases * 40',
+        get_fill_color=[81, 100, 191, 140],
+        pickable=True,
+    )
+    view_state = pdk.ViewState(latitude=center_lat, longitude=center_lng,
+                               zoom=zoom)
+    return pdk.Deck(
+        layers=[heat_layer, marker_layer],
+        initial_view_state=view_state,
+        tooltip={'text': '{City}: {ScamCases} scam cases'},
+    )
+
+# One geocoder for the app lifetime: the requests adapter keeps the
+# TCP+TLS connection to Nominatim alive across lookups
+_geolocator = Nominatim(user_agent="upi_scam_detector",
+                        adapter_factory=geopy.adapters.RequestsAdapter)
+
+# Coordinates barely change, so cache them on disk for a month: repeat
+# lookups of the same city skip Nominatim entirely, across restarts,
+# which also keeps us clear of its rate limits. The lru_cache on top
+# serves intra-session repeats without touching SQLite.
+GEO_CACHE_TTL_SECONDS = 30 * 86400
+_geo_cache = Cache('./geo_cache')
+
+@lru_cache(maxsize=4096)
 def geocode_city(city_name, country="India"):
-    """Get coordinates for a city using Geopy"""
+    """Get coordinates for a city using Geopy (memoized per city)"""
+    key = f'{city_name}|{country}'.lower()
+    cached = _geo_cache.get(key)
+    if cached is not None:
+        return cached
     try:
-        geolocator = Nominatim(user_agent="upi_scam_detector")
-        location = geolocator.geocode(f"{city_name}, {country}")
+        location = _geolocator.geocode(f"{city_name}, {country}")
         if location:
-            return location.latitude, location.longitude
+            coords = (location.latitude, location.longitude)
+            _geo_cache.set(key, coords, expire=GEO_CACHE_TTL_SECONDS)
+            return coords
         return None, None
     except Exception as e:
         st.error(f"Error geocoding {city_name}: {e}")
         return None, None
 
+@st.cache_data(show_spinner=False)
+def get_sorted_options(df):
+    """Sorted city and state option lists, computed once per dataset"""
+    return sorted(df['City'].unique().tolist()), sorted(df['State'].unique())
+
+@st.cache_data(show_spinner=False)
+def prepare_analytics_table(df, state_filter, risk_filter):
+    """Filter and sort the analytics view, cached per filter combination.
+
+    st.tabs runs both tab bodies on every rerun, so without this the
+    table was re-filtered and re-sorted even while the user was looking
+    at the map.
+    """
+    display_df = df
+    if state_filter:
+        display_df = display_df[display_df['State'].isin(state_filter)]
+    if risk_filter:
+        # Categorical .isin compares integer codes, not strings per row
+        display_df = display_df[display_df['Risk'].isin(risk_filter)]
+
+    table = display_df[['City', 'State', 'Scam Cases',
+                        'Last Reported Date']].sort_values(
+        by='Scam Cases', ascending=False)
+    return display_df, table
+
+@st.cache_data(show_spinner=False)
+def get_scam_type_cols(columns):
+    """Scam type columns and display labels, computed once per schema"""
+    scam_type_cols = [col for col in columns if '_' in col]
+    labels = [col.replace('_', ' ') for col in scam_type_cols]
+    return scam_type_cols, labels
+
 def create_scam_type_chart(city_data):
     """Create a pie chart showing the breakdown of different scam types for a city"""
     # Get scam type columns (they all start with an uppercase letter and have an underscore)
-    scam_type_cols = [col for col in city_data.index if '_' in col]
-    
+    scam_type_cols, labels = get_scam_type_cols(tuple(city_data.index))
+
     if not scam_type_cols:
         return None  # No scam type data available
-    
-    # Get values and labels
-    values = [city_data[col] for col in scam_type_cols]
-    labels = [col.replace('_', ' ') for col in scam_type_cols]
-    
-    # If there are too many small segments, combine them into "Others"
+
+    # If there are too many small segments, combine them into "Others".
+    # One boolean mask replaces the old remove-by-index comprehensions.
     threshold = 0.05  # 5% threshold
-    total = sum(values)
-    small_indices = [i for i, v in enumerate(values) if v/total < threshold]
-    
-    if small_indices:
-        others_value = sum(values[i] for i in small_indices)
-        new_values = [v for i, v in enumerate(values) if i not in small_indices]
-        new_labels = [l for i, l in enumerate(labels) if i not in small_indices]
-        
-        new_values.append(others_value)
-        new_labels.append('Others')
-        
-        values = new_values
-        labels = new_labels
-    
-    # Create pie chart with Plotly
+    values = city_data[scam_type_cols].to_numpy(dtype=np.float64)
+    small = values / values.sum() < threshold
+
+    if small.any():
+        values = np.append(values[~small], values[small].sum())
+        labels = [label for label, is_small in zip(labels, small)
+                  if not is_small] + ['Others']
+
+    # Create pie chart with Plotly. sort=False skips the client-side
+    # slice re-sort, and pinning uirevision lets Plotly keep its layout
+    # across Streamlit reruns instead of recomputing it each time.
     fig = go.Figure(data=[go.Pie(
         labels=labels,
-        values=values,
+        values=values.tolist(),
         hole=.3,
+        sort=False,
+        direction='clockwise',
         marker=dict(colors=px.colors.qualitative.Safe)
     )])
-    
+
     fig.update_layout(
         title_text=f"Scam Type Distribution in {city_data['City']}",
         showlegend=True,
         legend=dict(orientation="h", yanchor="bottom", y=-0.2, xanchor="center", x=0.5),
         margin=dict(t=40, b=40, l=40, r=40),
-        height=400
+        height=400,
+        transition_duration=0,
+        uirevision='scam_pie'
     )
     
     return fig
 
+# Demonstration split of new-city cases across scam types; the Others
+# column absorbs the rounding remainder so the total always adds up
+SCAM_TYPE_COLS = ['UPI_Fraud', 'Fake_Store', 'Phishing', 'Investment',
+                  'QR_Code']
+SCAM_TYPE_PROPS = np.array([0.40, 0.20, 0.15, 0.15, 0.05])
+
 def add_new_city(df, city, state, scam_cases, has_scam_types=False):
     """Add a new city to the dataset"""
     lat, lng = geocode_city(f"{city}, {state}")
@@ -216,25 +378,34 @@ def add_new_city(df, city, state, scam_cases, has_scam_types=False):
         
         # Add scam type data if using enhanced dataset
         if has_scam_types:
-            # Distribute the scam cases across different types
-            # This is a simple distribution for demonstration
-            new_entry["UPI_Fraud"] = int(scam_cases * 0.4)  # 40% UPI Fraud
-            new_entry["Fake_Store"] = int(scam_cases * 0.2)  # 20% Fake Store
-            new_entry["Phishing"] = int(scam_cases * 0.15)  # 15% Phishing
-            new_entry["Investment"] = int(scam_cases * 0.15)  # 15% Investment
-            new_entry["QR_Code"] = int(scam_cases * 0.05)  # 5% QR Code
-            new_entry["Others"] = scam_cases - sum([new_entry["UPI_Fraud"], new_entry["Fake_Store"], 
-                                               new_entry["Phishing"], new_entry["Investment"], 
-                                               new_entry["QR_Code"]])  # Remainder to make sure it adds up
-        
-        # Save to appropriate file
-        new_df = pd.concat([df, pd.DataFrame([new_entry])], ignore_index=True)
-        if has_scam_types:
-            new_df.to_csv('updated_scam_data.csv', index=False)
-        else:
-            new_df.to_csv('scam_data.csv', index=False)
+            # Distribute the scam cases across the types in one
+            # vectorized multiply instead of a hand-written line per type
+            counts = np.floor(scam_cases * SCAM_TYPE_PROPS).astype(int)
+            new_entry.update(zip(SCAM_TYPE_COLS, counts.tolist()))
+            new_entry["Others"] = scam_cases - int(counts.sum())
         
-        return new_df, True
+        # Appending one row is O(1); rebuilding the frame with pd.concat
+        # copied every existing row just to persist one. The cached
+        # loader is cleared so the next rerun picks the row up.
+        path = 'updated_scam_data.csv' if has_scam_types else 'scam_data.csv'
+        # Risk is derived at load time and not stored in the CSV
+        fieldnames = df.columns.drop('Risk', errors='ignore').tolist()
+        # The shipped CSVs end without a trailing newline; appending
+        # blindly would fuse the new row onto the last existing one and
+        # break the next parse
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+        with open(path, 'a', newline='') as f:
+            if needs_newline:
+                f.write('\n')
+            csv.DictWriter(f, fieldnames=fieldnames,
+                           lineterminator='\n').writerow(new_entry)
+        _load_data_cached.clear()
+
+        return df, True
     
     return df, False
 
@@ -282,6 +453,8 @@ def main():
         st.warning("No data available. Please check the data file.")
         return
     
+    cities_sorted, states_sorted = get_sorted_options(df)
+
     # Create sidebar for enhanced controls
     with st.sidebar:
         st.header("Map Controls")
@@ -296,15 +469,18 @@ def main():
         if search_option == "Select from list":
             search_city = st.selectbox(
                 "Select a city to highlight:",
-                options=[""] + sorted(df['City'].unique().tolist())
+                options=[""] + cities_sorted
             )
         else:
             # Direct city input with autocomplete suggestion
             city_input = st.text_input("Enter city name:")
             if city_input:
-                # Find closest match in the dataframe
-                matching_cities = [city for city in df['City'].unique() 
-                                  if city_input.lower() in city.lower()]
+                # Vectorized case-insensitive substring match instead of
+                # lowercasing every city in Python per keystroke
+                unique_cities = df['City'].drop_duplicates()
+                mask = unique_cities.str.contains(city_input, case=False,
+                                                  regex=False, na=False)
+                matching_cities = unique_cities[mask].tolist()
                 if matching_cities:
                     search_city = st.selectbox(
                         "Did you mean:",
@@ -329,10 +505,15 @@ def main():
         
         # Filter data by date
         filtered_df = df[df['Last Reported Date'].dt.date <= selected_date]
-        
+
+        # Select the city row once; the stats below, the map centering
+        # and the scam-type chart all reuse it instead of re-scanning
+        # the frame per use
+        city_data = (df[df['City'] == search_city].iloc[0]
+                     if search_city else None)
+
         # Display city stats if selected
         if search_city:
-            city_data = df[df['City'] == search_city].iloc[0]
             st.markdown(f"""
             ### {search_city} Stats
             - **Scam Cases:** {city_data['Scam Cases']}
@@ -340,8 +521,8 @@ def main():
             - **State:** {city_data['State']}
             """)
             
-            # Risk level indicator
-            risk_level = "High Risk" if city_data['Scam Cases'] > 400 else "Medium Risk" if city_data['Scam Cases'] > 200 else "Low Risk"
+            # Risk level indicator - precomputed at load time
+            risk_level = str(city_data['Risk'])
             risk_color = "red" if risk_level == "High Risk" else "orange" if risk_level == "Medium Risk" else "green"
             st.markdown(f"- **Risk Level:** <span style='color:{risk_color};font-weight:bold;'>{risk_level}</span>", unsafe_allow_html=True)
             
@@ -362,8 +543,10 @@ def main():
                     updated_df, success = add_new_city(df, new_city, new_state, new_cases, has_scam_types)
                     if success:
                         st.success(f"Added {new_city}, {new_state} with {new_cases} scam cases")
-                        # Refresh the page to load new data
-                        st.experimental_rerun()
+                        # add_new_city already cleared the cached loader,
+                        # so this rerun reparses the CSV with the new row.
+                        # st.rerun replaces the deprecated experimental API.
+                        st.rerun()
                     else:
                         st.error(f"Failed to geocode {new_city}, {new_state}")
                 else:
@@ -375,38 +558,50 @@ def main():
     tab1, tab2 = st.tabs(["Scam Map", "Scam Analytics"])
     
     with tab1:
+        # WebGL rendering offloads the heatmap to the browser GPU; the
+        # folium map stays the default for its richer popups
+        use_webgl = st.checkbox("Use WebGL renderer (faster for large datasets)",
+                                value=False)
+
         # Map settings
         zoom_level = 5
         center_lat = 20.5937
         center_lng = 78.9629
         
         # If a city is selected, center the map on it
-        if search_city:
-            city_data = df[df['City'] == search_city].iloc[0]
+        if city_data is not None:
             center_lat = city_data['Latitude']
             center_lng = city_data['Longitude']
             zoom_level = 8
         
-        # Generate and display the map
-        m = generate_map(
-            filtered_df, 
-            center_lat=center_lat, 
+        # Generate the folium map (cached across reruns); also used by
+        # the HTML download below, so it is built for both renderers
+        map_html = render_map_html(
+            filtered_df,
+            center_lat=center_lat,
             center_lng=center_lng,
             zoom=zoom_level,
             search_city=search_city if search_city else None
         )
-        
-        # Show the map with increased width to fit the entire India map
-        folium_static(m, width=1100, height=600)
+
+        if use_webgl:
+            st.pydeck_chart(generate_deck(filtered_df, center_lat=center_lat,
+                                          center_lng=center_lng,
+                                          zoom=zoom_level - 1))
+        else:
+            # Show the map with increased width to fit the entire India map
+            components.html(map_html, width=1100, height=600)
         
         # Display pie chart for selected city if applicable
         if search_city and has_scam_types and st.session_state.get('show_scam_types', False):
-            city_data = df[df['City'] == search_city].iloc[0]
-            
             st.subheader(f"Scam Type Breakdown for {search_city}")
             fig = create_scam_type_chart(city_data)
             if fig:
-                st.plotly_chart(fig, use_container_width=True)
+                # The chart is view-only: a static plot skips the hover
+                # and selection machinery, and a fixed width avoids the
+                # resize-on-rerun that use_container_width triggers
+                st.plotly_chart(fig, use_container_width=False,
+                                config={'staticPlot': True})
             else:
                 st.warning("No scam type data available for this city")
     
@@ -420,8 +615,8 @@ def main():
         col1, col2 = st.columns(2)
         with col1:
             state_filter = st.multiselect(
-                "Filter by State:", 
-                options=sorted(df['State'].unique()),
+                "Filter by State:",
+                options=states_sorted,
                 default=[]
             )
         
@@ -432,31 +627,13 @@ def main():
                 default=[]
             )
         
-        # Apply filters
-        display_df = filtered_df.copy()
-        
-        if state_filter:
-            display_df = display_df[display_df['State'].isin(state_filter)]
-        
-        if risk_filter:
-            risk_conditions = []
-            if "High Risk" in risk_filter:
-                risk_conditions.append(display_df['Scam Cases'] > 400)
-            if "Medium Risk" in risk_filter:
-                risk_conditions.append((display_df['Scam Cases'] > 200) & (display_df['Scam Cases'] <= 400))
-            if "Low Risk" in risk_filter:
-                risk_conditions.append(display_df['Scam Cases'] <= 200)
-            
-            if risk_conditions:
-                display_df = display_df[pd.concat(risk_conditions, axis=1).any(axis=1)]
-        
+        # Filter + sort are cached per filter combination, so switching
+        # back to the map tab doesn't redo the table work
+        display_df, table = prepare_analytics_table(
+            filtered_df, tuple(state_filter), tuple(risk_filter))
+
         # Display the enhanced data table
-        st.dataframe(
-            display_df[['City', 'State', 'Scam Cases', 'Last Reported Date']].sort_values(
-                by='Scam Cases', ascending=False
-            ),
-            use_container_width=True
-        )
+        st.dataframe(table, use_container_width=True)
         
         # Show summary statistics
         st.subheader("Summary Statistics")
@@ -475,14 +652,15 @@ def main():
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Download Map as HTML"):
-            m.save("fraud_map.html")
-            with open("fraud_map.html", "rb") as file:
-                btn = st.download_button(
-                    label="Click to Download",
-                    data=file,
-                    file_name="fraud_map.html",
-                    mime="text/html"
-                )
+            # The cached render already holds the HTML string; hand it to
+            # the download button directly instead of round-tripping it
+            # through a file on disk
+            btn = st.download_button(
+                label="Click to Download",
+                data=map_html,
+                file_name="fraud_map.html",
+                mime="text/html"
+            )
     
     with col2:
         if st.button("Download Scam Data CSV"):
@@ -2,73 +2,220 @@
 # 🚀 Optimized Initial Training & UPI Detection
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import uvicorn
+import asyncio
 import re
 import time
+import threading
 import joblib
+from functools import lru_cache
 from sklearn.linear_model import SGDClassifier
-from sklearn.feature_extraction import DictVectorizer
+from sklearn.feature_extraction import FeatureHasher
 from sklearn.pipeline import make_pipeline
 from diskcache import Cache
-import json
+from ttl_cache import TTLLRUCache
+import orjson
 import os
 
 # 📦 Pre-Trained Model Setup
 MODEL_FILE = "model.joblib"
-DATA_FILE = "qr_data.json"
+DATA_FILE = "qr_data.jsonl"
+LEGACY_DATA_FILE = "qr_data.json"
 
-def load_data():
-    """Load training data with initial safe examples"""
+INITIAL_X = [
+    # Initial safe UPI examples
+    {'length': 45, 'has_upi': 1, 'num_params': 2, 'urgent': 0, 'payment': 0, 'currency': 1},
+    {'length': 50, 'has_upi': 1, 'num_params': 3, 'urgent': 0, 'payment': 0, 'currency': 1},
+    # Common scam patterns
+    {'length': 80, 'has_upi': 0, 'num_params': 5, 'urgent': 1, 'payment': 1, 'currency': 0},
+]
+INITIAL_Y = [0, 0, 1]  # Corresponding labels (0 = safe, 1 = scam)
+
+# 💾 Data Storage
+# Training data lives in memory and on disk as append-only JSONL: one
+# {'x': features, 'y': label} object per line. A feedback sample costs
+# one appended line instead of re-parsing and rewriting the whole file.
+def _load_training_data():
+    """Load the JSONL training data, migrating the old JSON blob once"""
+    X, y = [], []
     if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
-            return json.load(f)
-    return {
-        'X': [
-            # Initial safe UPI examples
-            {'length': 45, 'has_upi': 1, 'num_params': 2, 'urgent': 0, 'payment': 0, 'currency': 1},
-            {'length': 50, 'has_upi': 1, 'num_params': 3, 'urgent': 0, 'payment': 0, 'currency': 1},
-            # Common scam patterns
-            {'length': 80, 'has_upi': 0, 'num_params': 5, 'urgent': 1, 'payment': 1, 'currency': 0},
-        ],
-        'y': [0, 0, 1]  # Corresponding labels (0 = safe, 1 = scam)
-    }
+        with open(DATA_FILE, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    sample = orjson.loads(line)
+                    X.append(sample['x'])
+                    y.append(sample['y'])
+        return X, y
+    if os.path.exists(LEGACY_DATA_FILE):
+        with open(LEGACY_DATA_FILE, 'rb') as f:
+            legacy = orjson.loads(f.read())
+        X, y = list(legacy['X']), list(legacy['y'])
+    else:
+        X, y = list(INITIAL_X), list(INITIAL_Y)
+    # Write the seed/migrated samples so the JSONL file is authoritative
+    with open(DATA_FILE, 'wb') as f:
+        for features, label in zip(X, y):
+            f.write(orjson.dumps({'x': features, 'y': label}) + b'\n')
+    return X, y
+
+TRAIN_X, TRAIN_Y = _load_training_data()
+# One handle for all appends; guarded together with the lists because
+# feedback handling runs on the threadpool
+_data_file = open(DATA_FILE, 'ab')
+_data_lock = threading.Lock()
 
-# 💾 Data Storage Functions
-def save_data(data):
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f)
+def append_sample(features, label):
+    """Append one sample to memory and the JSONL file"""
+    with _data_lock:
+        TRAIN_X.append(features)
+        TRAIN_Y.append(label)
+        _data_file.write(orjson.dumps({'x': features, 'y': label}) + b'\n')
+        _data_file.flush()
+        return len(TRAIN_Y)
+
+def save_model():
+    """Persist the model atomically via temp file + rename"""
+    tmp = MODEL_FILE + '.tmp'
+    joblib.dump(model, tmp)
+    os.replace(tmp, MODEL_FILE)
 
 # Initialize model with pre-trained data
+model = None
 if os.path.exists(MODEL_FILE):
-    model = joblib.load(MODEL_FILE)
-else:
+    # mmap the model's numpy buffers read-only so forked workers share
+    # one physical copy via the page cache instead of each loading a heap copy
+    try:
+        model = joblib.load(MODEL_FILE, mmap_mode='r')
+    except (OSError, EOFError, ValueError, AttributeError, ImportError):
+        # Artifacts pickled under another sklearn version (or module
+        # path) can fail to unpickle at all; fall through to the
+        # rebuild below instead of dying at import
+        model = None
+    if model is not None and 'featurehasher' not in getattr(model, 'named_steps', {}):
+        # Pre-hasher artifact (the old DictVectorizer pipeline): it
+        # cannot be updated with partial_fit, so rebuild from the
+        # training data and replace the stale file
+        model = None
+if model is None:
+    # FeatureHasher is stateless (fixed 2^10 feature space), so the model
+    # can be updated incrementally with partial_fit instead of refitting
+    # on the full dataset every time - O(new samples) per update
     model = make_pipeline(
-        DictVectorizer(),
-        SGDClassifier(loss='log_loss', class_weight='balanced')
+        FeatureHasher(n_features=2 ** 10, input_type='dict',
+                      alternate_sign=False),
+        SGDClassifier(loss='log_loss')
     )
-    # Train on initial data immediately
-    initial_data = load_data()
-    if initial_data['X']:
-        model.fit(initial_data['X'], initial_data['y'])
-        joblib.dump(model, MODEL_FILE)
-        save_data(initial_data)  # Save initial dataset
+    # Train on whatever data is already on disk (or the seed samples)
+    if TRAIN_X:
+        model.fit(TRAIN_X, TRAIN_Y)
+        save_model()
+
+def incremental_update(new_X, new_y):
+    """Fold a batch of feedback samples into the model via partial_fit"""
+    hasher = model.named_steps['featurehasher']
+    clf = model.named_steps['sgdclassifier']
+    # mmap-loaded coefficients are read-only; copy before the first update
+    if hasattr(clf, 'coef_') and not clf.coef_.flags.writeable:
+        clf.coef_ = clf.coef_.copy()
+        clf.intercept_ = clf.intercept_.copy()
+    clf.partial_fit(hasher.transform(new_X), new_y, classes=[0, 1])
 
 # 🚄 Enhanced Feature Extraction
-def extract_features(qr_text: str) -> dict:
+# Features are a pure function of the QR text, so repeat payloads (the
+# common case between cache expiries) cost one dict copy instead of a
+# recompute. The cached helper returns an immutable tuple; callers get a
+# fresh dict so nothing can mutate the cached entry.
+@lru_cache(maxsize=10000)
+def _extract_feature_items(qr_text: str) -> tuple:
     qr_lower = qr_text.lower()
-    return {
-        'length': min(len(qr_text), 100),
-        'has_upi': int(re.search(r'^upi://', qr_lower) is not None),
-        'num_params': qr_text.count('&'),
-        'urgent': int('urgent' in qr_lower),
-        'payment': int('payment' in qr_lower),
-        'currency': int('inr' in qr_lower)  # New feature
-    }
+    return (
+        ('length', min(len(qr_text), 100)),
+        # startswith is a direct memcmp; the old anchored re.search
+        # re-fetched the pattern from the regex cache on every call
+        ('has_upi', int(qr_lower.startswith('upi://'))),
+        ('num_params', qr_text.count('&')),
+        ('urgent', int('urgent' in qr_lower)),
+        ('payment', int('payment' in qr_lower)),
+        ('currency', int('inr' in qr_lower))  # New feature
+    )
 
-app = FastAPI()
+def extract_features(qr_text: str) -> dict:
+    return dict(_extract_feature_items(qr_text))
+
+# orjson encodes responses in C, ~3-5x faster than the stdlib encoder
+app = FastAPI(default_response_class=ORJSONResponse)
 cache = Cache('./cache')
 
+# In-process L1 in front of the diskcache: a repeat hit costs a dict
+# lookup instead of a SQLite read. Shares TTLLRUCache with the response
+# and threat-verdict caches in qr_scam_service.
+_l1_cache = TTLLRUCache(max_size=10000, ttl_seconds=300)
+
+# Fast path for the high-volume legit case: VPAs confirmed safe through
+# feedback skip feature extraction and the model entirely. Persisted in
+# the cache so restarts keep the learned set.
+#
+# Whitelisting is gated, since /feedback is unauthenticated: a VPA needs
+# several corroborating safe reports and no recent scam report before it
+# earns the shortcut, and a single scam report revokes it and resets the
+# count. Per-VPA report state is persisted alongside the set.
+SAFE_VPA_MIN_REPORTS = 3
+SAFE_VPA_SCAM_COOLDOWN_SECONDS = 7 * 86400
+_UPI_PA_RE = re.compile(r'pa=([^&]+)')
+_SAFE_VPAS = set(cache.get('safe_vpas') or ())
+_VPA_REPORTS = cache.get('vpa_reports') or {}
+
+def _extract_vpa(qr_text: str):
+    """Pull the pa= VPA out of a UPI QR payload, or None"""
+    if not qr_text.startswith('upi://'):
+        return None
+    match = _UPI_PA_RE.search(qr_text)
+    return match.group(1) if match else None
+
+# Micro-batching: sklearn's per-call overhead (pipeline dispatch, hasher
+# setup, the BLAS call) is nearly flat in batch size, so coalescing
+# requests that arrive within a few ms into one predict_proba call
+# amortizes it across all of them. A single worker also means at most
+# one GIL-heavy model call runs at a time, which is what the old
+# semaphore was bounding.
+PREDICT_BATCH_MAX = 32
+PREDICT_BATCH_WINDOW_SECONDS = 0.005
+_predict_queue = None
+
+async def _predict_worker():
+    """Drain the queue in small batches and score each batch at once"""
+    while True:
+        batch = [await _predict_queue.get()]
+        deadline = time.time() + PREDICT_BATCH_WINDOW_SECONDS
+        while len(batch) < PREDICT_BATCH_MAX:
+            timeout = deadline - time.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(
+                    _predict_queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        features_list = [features for features, _ in batch]
+        try:
+            probas = await asyncio.to_thread(
+                model.predict_proba, features_list)
+            for (_, future), proba in zip(batch, probas[:, 1]):
+                if not future.done():
+                    future.set_result(float(proba))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+@app.on_event("startup")
+async def _start_predict_worker():
+    global _predict_queue
+    _predict_queue = asyncio.Queue()
+    asyncio.create_task(_predict_worker())
+
 class QRRequest(BaseModel):
     qr_text: str
 
@@ -76,28 +223,48 @@ class QRRequest(BaseModel):
 async def predict(request: QRRequest):
     start = time.time()
     
-    # 🔍 Cache First
-    if request.qr_text in cache:
-        return {**cache[request.qr_text], "cached": True}
-    
+    # 🔍 Cache First - L1 dict, then the diskcache
+    cached = _l1_cache.get(request.qr_text)
+    if cached is None:
+        cached = cache.get(request.qr_text)
+        if cached is not None:
+            _l1_cache.set(request.qr_text, cached)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    # ✅ Known-safe VPA short circuit - no features, no model. Capped at
+    # low-risk rather than a hard 0 so the shortcut is never treated as
+    # absolute truth downstream.
+    vpa = _extract_vpa(request.qr_text)
+    if vpa is not None and vpa in _SAFE_VPAS:
+        return {
+            "risk_score": 5,
+            "latency_ms": round((time.time() - start) * 1000, 2),
+            "safe_vpa": True
+        }
+
     # ⚡ Feature Extraction
     features = extract_features(request.qr_text)
     
-    # 🧠 Model Prediction
+    # 🧠 Model Prediction - hand off to the micro-batching worker, which
+    # scores everything that arrived within the window in one call
     try:
-        proba = model.predict_proba([features])[0][1]
+        future = asyncio.get_running_loop().create_future()
+        await _predict_queue.put((features, future))
+        proba = await future
     except Exception as e:
         proba = 0.5  # Fallback for empty model
     
     risk_score = round(proba * 100, 2)
     
     # 🛡️ Enhanced Security Rules
-    upi_safe_boost = 0
-    if features['has_upi']:
-        upi_safe_boost = -25  # UPI links get safety boost
-        if features['payment'] and not features['urgent']:
-            upi_safe_boost = -15  # Payment UPI less reduction
-    
+    # Branchless form of: UPI links get -25, payment UPI without urgency -15.
+    # The feature flags are already 0/1 ints, so the boost is straight arithmetic
+    # with no data-dependent jumps.
+    upi_safe_boost = -features['has_upi'] * (
+        25 - 10 * features['payment'] * (1 - features['urgent'])
+    )
+
     risk_score = max(0, min(100, risk_score + upi_safe_boost))
     
     result = {
@@ -106,23 +273,64 @@ async def predict(request: QRRequest):
         "features": features  # For debugging
     }
     
+    _l1_cache.set(request.qr_text, result)
     cache.set(request.qr_text, result, expire=300)
     return result
 
+def _record_feedback(qr_text: str, is_scam: bool) -> bool:
+    """Record one feedback sample; returns True when a retrain is due"""
+    # Keep the safe-VPA fast path in sync with what users report
+    vpa = _extract_vpa(qr_text)
+    if vpa is not None:
+        safe_count, last_scam_at = _VPA_REPORTS.get(vpa, (0, 0.0))
+        if is_scam:
+            # One scam report revokes the shortcut and resets the tally
+            safe_count, last_scam_at = 0, time.time()
+            _SAFE_VPAS.discard(vpa)
+        else:
+            safe_count += 1
+            if (safe_count >= SAFE_VPA_MIN_REPORTS
+                    and time.time() - last_scam_at
+                    > SAFE_VPA_SCAM_COOLDOWN_SECONDS):
+                _SAFE_VPAS.add(vpa)
+        _VPA_REPORTS[vpa] = (safe_count, last_scam_at)
+        cache.set('vpa_reports', _VPA_REPORTS)
+        cache.set('safe_vpas', list(_SAFE_VPAS))
+
+    features = extract_features(qr_text)
+    total = append_sample(features, int(is_scam))
+    return total % 25 == 0
+
+# Serializes retrains so bursty feedback can't run overlapping updates
+_retrain_lock = threading.Lock()
+
+def _retrain():
+    """Fold the latest batch into the model and persist it.
+
+    partial_fit only touches the new batch instead of refitting on the
+    ever-growing full dataset.
+    """
+    with _retrain_lock:
+        with _data_lock:
+            new_X, new_y = TRAIN_X[-25:], TRAIN_Y[-25:]
+        incremental_update(new_X, new_y)
+        save_model()
+
+def _log_retrain_result(task):
+    """Surface background retrain failures instead of dropping them"""
+    exc = task.exception()
+    if exc is not None:
+        print(f"Background retrain failed: {exc!r}")
+
 @app.post("/feedback")
 async def feedback(qr_text: str, is_scam: bool):
-    features = extract_features(qr_text)
-    data = load_data()
-    
-    data['X'].append(features)
-    data['y'].append(int(is_scam))
-    
-    # Retrain with every 25 new samples (improved frequency)
-    if len(data['y']) % 25 == 0:
-        model.fit(data['X'], data['y'])
-        joblib.dump(model, MODEL_FILE)
-        save_data(data)
-    
+    # The append is quick but still blocking, so it runs on the
+    # threadpool; the retrain (model update + joblib.dump) is fired as a
+    # background task so the response returns without waiting on it
+    retrain_due = await asyncio.to_thread(_record_feedback, qr_text, is_scam)
+    if retrain_due:
+        task = asyncio.create_task(asyncio.to_thread(_retrain))
+        task.add_done_callback(_log_retrain_result)
     return {"status": "feedback_received"}
 
 if __name__ == "__main__":
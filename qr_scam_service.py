@@ -5,127 +5,263 @@ Provides real-time QR code fraud detection using Flask
 
 import os
 import re
-import pandas as pd
-import numpy as np
-from flask import Flask, request, jsonify
-from sklearn.ensemble import RandomForestClassifier
-import joblib
 import requests
+from flask import Flask, request, jsonify
 from scam_model import QRScamModel, VALID_UPI_REGEX
+from ttl_cache import TTLLRUCache
 
 app = Flask(__name__)
 
+# Hoisted keyword set - lowercased once, shared by every request
+URGENT_KEYWORDS = frozenset({'urgent', 'kyc', 'verify'})
+
+# Precompiled patterns - compiling per request re-parses the pattern and
+# takes the re cache lock every call. re.ASCII keeps the character
+# classes on the fast byte-oriented paths (QR payloads are ASCII URIs).
+# pa= and am= are pulled out by one combined pattern in a single scan.
+_UPI_PARAM_RE = re.compile(r'(pa|am)=([^&]+)', re.ASCII)
+_UPI_ID_RE = re.compile(r'([a-zA-Z0-9.\-_]+@[a-zA-Z0-9]+)', re.ASCII)
+
+# Static parts of the error response, built once at import. Only the
+# payload length differs per failure, so the hot error path just copies.
+ERROR_FEATURES = {
+    'length': 0,
+    'has_upi': 0,
+    'num_params': 0,
+    'urgent': 0,
+    'payment': 0,
+    'currency': 0
+}
+ERROR_RESPONSE = {
+    'risk_score': 50,  # Moderate risk as fallback
+    'latency_ms': 10,
+    'error': 'Security check failed',
+    'features': ERROR_FEATURES
+}
+
+# Bounded LRU + TTL cache so repeated scans of the same QR skip the model
+# entirely
+_result_cache = TTLLRUCache(max_size=10000, ttl_seconds=300)
+
 # Initialize QR scam model
 model = QRScamModel()
 model_loaded = model.load()  # Try to load pre-trained model
 if not model_loaded:
     print("No trained model found, using rule-based detection")
 
+# One session for all Safe Browsing lookups: the pooled keep-alive
+# connection amortizes the TCP+TLS handshake across requests instead of
+# paying it on every call
+SAFE_BROWSING_API_KEY = os.environ.get('SAFE_BROWSING_API_KEY', '')
+SAFE_BROWSING_URL = 'https://safebrowsing.googleapis.com/v4/threatMatches:find'
+SAFE_BROWSING_TIMEOUT = 2.0
+_threat_session = requests.Session()
+
+# Verdicts are stable for hours, so cache them far longer than the
+# response cache - repeat scans of the same URL skip the round trip
+_threat_cache = TTLLRUCache(max_size=10000, ttl_seconds=3600)
+
 def check_live_threats(text):
-    """Query PhishTank and Google Safe Browsing"""
-    # Note: In production, replace with actual API keys
+    """Query Google Safe Browsing for known malicious URLs"""
+    if not SAFE_BROWSING_API_KEY:
+        return False  # No key configured - skip the network call entirely
+    cached = _threat_cache.get(text)
+    if cached is not None:
+        return cached
     try:
-        # Simulate API call result - in production use actual APIs
-        return False  # Default to no threat detected for demo
+        payload = {
+            'client': {'clientId': 'safepay', 'clientVersion': '1.0'},
+            'threatInfo': {
+                'threatTypes': ['MALWARE', 'SOCIAL_ENGINEERING'],
+                'platformTypes': ['ANY_PLATFORM'],
+                'threatEntryTypes': ['URL'],
+                'threatEntries': [{'url': text}]
+            }
+        }
+        response = _threat_session.post(
+            f'{SAFE_BROWSING_URL}?key={SAFE_BROWSING_API_KEY}',
+            json=payload, timeout=SAFE_BROWSING_TIMEOUT)
+        verdict = bool(response.json().get('matches'))
+        _threat_cache.set(text, verdict)
+        return verdict
     except Exception as e:
         print(f"Error checking external threat APIs: {str(e)}")
         return False
 
+def check_live_threats_batch(texts):
+    """Check many URLs with a single Safe Browsing call.
+
+    The threatMatches:find endpoint accepts an array of threatEntries,
+    so an N-item batch costs one round trip instead of N.
+    """
+    if not SAFE_BROWSING_API_KEY or not texts:
+        return [False] * len(texts)
+    # Serve what the verdict cache already knows; only the rest go on
+    # the wire
+    verdicts = {text: _threat_cache.get(text) for text in set(texts)}
+    unknown = [text for text, verdict in verdicts.items() if verdict is None]
+    if not unknown:
+        return [verdicts[text] for text in texts]
+    try:
+        payload = {
+            'client': {'clientId': 'safepay', 'clientVersion': '1.0'},
+            'threatInfo': {
+                'threatTypes': ['MALWARE', 'SOCIAL_ENGINEERING'],
+                'platformTypes': ['ANY_PLATFORM'],
+                'threatEntryTypes': ['URL'],
+                'threatEntries': [{'url': text} for text in unknown]
+            }
+        }
+        response = _threat_session.post(
+            f'{SAFE_BROWSING_URL}?key={SAFE_BROWSING_API_KEY}',
+            json=payload, timeout=SAFE_BROWSING_TIMEOUT)
+        flagged = {match.get('threat', {}).get('url')
+                   for match in response.json().get('matches', [])}
+        for text in unknown:
+            verdict = text in flagged
+            verdicts[text] = verdict
+            _threat_cache.set(text, verdict)
+        return [verdicts[text] for text in texts]
+    except Exception as e:
+        print(f"Error checking external threat APIs: {str(e)}")
+        return [bool(verdicts[text]) for text in texts]
+
 def extract_upi_info(raw_text):
     """Extract UPI ID and amount from QR data"""
     bene_vpa = ""
     amount = 0
-    
-    # Extract UPI ID
-    if 'pa=' in raw_text:
-        match = re.search(r'pa=([^&]+)', raw_text)
-        if match:
-            bene_vpa = match.group(1)
-    elif '@' in raw_text:
+
+    # One combined scan pulls out both parameters; the first match of
+    # each wins, mirroring the old separate searches
+    for key, value in _UPI_PARAM_RE.findall(raw_text):
+        if key == 'pa':
+            if not bene_vpa:
+                bene_vpa = value
+        elif amount == 0:
+            try:
+                amount = float(value)
+            except ValueError:
+                amount = 0
+
+    if not bene_vpa and 'pa=' not in raw_text and '@' in raw_text:
         # Try to find direct UPI ID pattern
-        match = re.search(r'([a-zA-Z0-9.\-_]+@[a-zA-Z0-9]+)', raw_text)
+        match = _UPI_ID_RE.search(raw_text)
         if match:
             bene_vpa = match.group(1)
-    
-    # Extract amount
-    if 'am=' in raw_text:
-        match = re.search(r'am=([^&]+)', raw_text)
-        if match:
-            try:
-                amount = float(match.group(1))
-            except:
-                amount = 0
-                
+
     return bene_vpa, amount
 
+def build_features(raw_text, text_lower):
+    """Build the response feature dict, lowering the text only once"""
+    return {
+        'length': len(raw_text),
+        'has_upi': 1 if 'upi://' in raw_text else 0,
+        'num_params': raw_text.count('&'),
+        'urgent': 1 if any(kw in text_lower for kw in URGENT_KEYWORDS) else 0,
+        'payment': 1 if 'payment' in text_lower else 0,
+        'currency': 1 if 'inr' in text_lower else 0
+    }
+
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
         data = request.json
         raw_text = data.get('qr_text', '')
-        
+
+        # Serve repeated scans straight from the cache
+        cached = _result_cache.get(raw_text)
+        if cached is not None:
+            return jsonify({**cached, 'cached': True})
+
+        # Lower the text once; every keyword check below reuses it
+        text_lower = raw_text.lower()
+        features = build_features(raw_text, text_lower)
+
         # Extract UPI ID and amount
         bene_vpa, amount = extract_upi_info(raw_text)
-        
+
         # Rule-Based First Layer
         if check_live_threats(raw_text):
             return jsonify({
                 'risk_score': 95,
                 'latency_ms': 120,
-                'label': 'Scam', 
+                'label': 'Scam',
                 'reason': 'Known malicious pattern',
-                'features': {
-                    'length': len(raw_text),
-                    'has_upi': 1 if 'upi://' in raw_text else 0,
-                    'num_params': raw_text.count('&'),
-                    'urgent': 1,
-                    'payment': 1 if 'pay' in raw_text.lower() else 0,
-                    'currency': 1 if 'inr' in raw_text.lower() else 0
-                }
+                'features': {**features, 'urgent': 1}
             })
 
         # Use model for prediction
         result = model.predict(bene_vpa, amount, raw_text)
-        
+
         # Convert to expected response format
         risk_score = int(result['probability'] * 100)
-        
+
         # Enhanced risk scoring for improved accuracy
-        if 'upi://' in raw_text and not any(kw in raw_text.lower() for kw in ['urgent', 'verify', 'kyc']):
+        if features['has_upi'] and not features['urgent']:
             risk_score = max(10, risk_score - 15)  # Reduce score for standard UPI QRs
-        
-        return jsonify({
+
+        response = {
             'risk_score': risk_score,
             'latency_ms': 50,
             'label': result['label'],
             'reason': result['reason'],
-            'features': {
-                'length': len(raw_text),
-                'has_upi': 1 if 'upi://' in raw_text else 0,
-                'num_params': raw_text.count('&'),
-                'urgent': 1 if any(kw in raw_text.lower() for kw in ['urgent', 'kyc', 'verify']) else 0,
-                'payment': 1 if 'payment' in raw_text.lower() else 0,
-                'currency': 1 if 'inr' in raw_text.lower() else 0
-            }
-        })
+            'features': features
+        }
+        _result_cache.set(raw_text, response)
+        return jsonify(response)
 
     except Exception as e:
         print(f"Prediction error: {str(e)}")
-        # Fallback to basic rule-based assessment
+        # Fallback to the pre-built rule-based assessment
+        if 'raw_text' in locals():
+            return jsonify({
+                **ERROR_RESPONSE,
+                'features': {**ERROR_FEATURES, 'length': len(raw_text)}
+            })
+        return jsonify(ERROR_RESPONSE)
+
+@app.route('/batch_predict', methods=['POST'])
+def batch_predict():
+    """Score a batch of QR codes with one vectorized model call"""
+    try:
+        data = request.json
+        qr_texts = data.get('qr_texts', [])
+
+        if not qr_texts:
+            return jsonify({'results': [], 'batch_size': 0})
+
+        # Parse every payload up front so the model sees the whole batch
+        parsed = [extract_upi_info(text) for text in qr_texts]
+        bene_vpas = [vpa for vpa, _ in parsed]
+        amounts = [amount for _, amount in parsed]
+
+        # One Safe Browsing round trip covers the whole batch
+        threats = check_live_threats_batch(qr_texts)
+        results = model.predict_batch(bene_vpas, amounts, qr_texts)
+
         return jsonify({
-            'risk_score': 50,  # Moderate risk as fallback
-            'latency_ms': 10,
-            'error': 'Security check failed',
-            'features': {
-                'length': len(raw_text) if 'raw_text' in locals() else 0,
-                'has_upi': 0,
-                'num_params': 0,
-                'urgent': 0,
-                'payment': 0,
-                'currency': 0
-            }
+            'results': [
+                {
+                    'risk_score': 95,
+                    'label': 'Scam',
+                    'reason': 'Known malicious pattern'
+                } if threat else {
+                    'risk_score': int(result['probability'] * 100),
+                    'label': result['label'],
+                    'reason': result['reason']
+                }
+                for result, threat in zip(results, threats)
+            ],
+            'batch_size': len(results)
         })
 
+    except Exception as e:
+        print(f"Batch prediction error: {str(e)}")
+        return jsonify({
+            'error': 'Batch security check failed',
+            'results': []
+        }), 400
+
 @app.route('/feedback', methods=['POST'])
 def feedback():
     """Process user feedback to improve the model"""
@@ -3,21 +3,69 @@ REAL-TIME QR SCAN SYSTEM (<100ms Latency)
 Replit-Optimized with River ML + FastAPI
 """
 
-from fastapi import FastAPI, Request, middleware
-from river import compose, linear_model, optim, preprocessing, metrics, drift
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+import orjson
+from river import compose, linear_model, optim, preprocessing
 from pydantic import BaseModel
-import uvicorn
+import os
 import numpy as np
 import re
 import time
-import json
-import asyncio
-from collections import deque
 from diskcache import Cache
-from typing import Optional, Dict, List, Any
 
 # Optimized regex patterns
 UPI_REGEX = re.compile(r'^upi://[^\s/$.?#].[^\s]*$', re.IGNORECASE)
+PA_PARAM_REGEX = re.compile(r'pa=([^&]+)', re.ASCII)
+
+# Hoisted keyword set - built once instead of per request
+SUSPICIOUS_KEYWORDS = frozenset({'urgent', 'payment', 'offer'})
+
+# Optional pyahocorasick: one automaton pass over the payload finds every
+# keyword at once instead of K independent substring scans. Falls back
+# to the plain membership loop when the library is not installed.
+try:
+    import ahocorasick
+    _KW_AUTOMATON = ahocorasick.Automaton()
+    for _kw in SUSPICIOUS_KEYWORDS:
+        _KW_AUTOMATON.add_word(_kw, _kw)
+    _KW_AUTOMATON.make_automaton()
+except ImportError:
+    _KW_AUTOMATON = None
+
+def count_suspicious_keywords(text_lower: str) -> int:
+    """Count distinct suspicious keywords in an already-lowercased text"""
+    if _KW_AUTOMATON is not None:
+        return len({kw for _, kw in _KW_AUTOMATON.iter(text_lower)})
+    return sum(1 for kw in SUSPICIOUS_KEYWORDS if kw in text_lower)
+
+# Numba is optional - when present the entropy kernel is JIT-compiled,
+# otherwise the plain numpy version is already far faster than the old
+# per-character Python loop
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+def _entropy_kernel(probs):
+    return -np.sum(probs * np.log2(probs))
+
+if _NUMBA_AVAILABLE:
+    _entropy_kernel = njit(cache=True)(_entropy_kernel)
+    _entropy_kernel(np.array([1.0]))  # warm the JIT at import time
+
+def shannon_entropy(text: str) -> float:
+    """Byte-level Shannon entropy of a QR payload (bits per byte)."""
+    if not text:
+        return 0.0
+    data = np.frombuffer(text.encode('utf-8', 'replace'), dtype=np.uint8)
+    counts = np.bincount(data)
+    probs = counts[counts > 0] / data.size
+    return float(_entropy_kernel(probs))
 
 # Ultra-Fast Feature Engineering
 feature_pipeline = compose.Pipeline(
@@ -45,39 +93,16 @@ model_shards = {
     'global': linear_model.PAClassifier()
 }
 
-app = FastAPI()
+# ORJSONResponse skips the stdlib json serializer; handlers return plain dicts
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Compress large responses (batch results); small single predictions stay
+# below the threshold and skip compression entirely
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
 
 class QRRequest(BaseModel):
     qr_text: str
 
-class BatchProcessor:
-    def __init__(self, max_batch_size=32, max_delay=0.05):
-        self.batch = deque()
-        self.max_batch_size = max_batch_size
-        self.max_delay = max_delay
-    
-    async def process(self, qr_text):
-        self.batch.append(qr_text)
-        if len(self.batch) >= self.max_batch_size:
-            return self.predict_batch()
-        await asyncio.sleep(self.max_delay)
-        return self.predict_batch()
-    
-    def predict_batch(self):
-        # Process all QR codes in batch
-        results = []
-        while self.batch:
-            qr_text = self.batch.popleft()
-            features = extract_features(qr_text)
-            prediction = model.predict_one(features)
-            proba = model.predict_proba_one(features).get(1, 0.0)
-            results.append({
-                "qr_text": qr_text,
-                "risk_score": round(proba * 100, 2),
-                "prediction": prediction
-            })
-        return results
-
 def is_valid_upi(qr_text):
     """Check if QR text contains valid UPI format"""
     return bool(UPI_REGEX.match(qr_text))
@@ -88,14 +113,13 @@ def route_model(qr_text):
 
 def extract_features(qr_text: str) -> dict:
     """Real-time feature extraction (<5ms)"""
+    text_lower = qr_text.lower()
     features = {
         'length': len(qr_text),
-        'entropy': -sum((count/len(qr_text)) * np.log2(count/len(qr_text)) 
-                     for count in [qr_text.count(c) for c in set(qr_text)] if count > 0),
+        'entropy': shannon_entropy(qr_text),
         'has_upi': int('upi://' in qr_text),
         'num_params': qr_text.count('&'),
-        'suspicious_keywords': sum(1 for kw in ['urgent', 'payment', 'offer'] 
-                                if kw in qr_text.lower())
+        'suspicious_keywords': count_suspicious_keywords(text_lower)
     }
     
     # Extract additional features for UPI QR codes
@@ -106,7 +130,7 @@ def extract_features(qr_text: str) -> dict:
         # Extract payment parameters
         if 'pa=' in qr_text:
             try:
-                pa_value = re.search(r'pa=([^&]+)', qr_text).group(1)
+                pa_value = PA_PARAM_REGEX.search(qr_text).group(1)
                 features['pa_length'] = len(pa_value)
                 features['has_valid_pa'] = int('@' in pa_value and '.' in pa_value)
             except:
@@ -121,6 +145,18 @@ def extract_features(qr_text: str) -> dict:
     
     return features
 
+@app.on_event("startup")
+async def configure_threadpool():
+    """Size the threadpool that runs the sync handlers.
+
+    AnyIO defaults to 40 worker threads; scale with the machine so a
+    burst of prediction requests is not queued behind an arbitrary cap.
+    """
+    from anyio import to_thread
+    to_thread.current_default_thread_limiter().total_tokens = int(
+        os.environ.get("THREADPOOL_SIZE", 8 * (os.cpu_count() or 4))
+    )
+
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     """Middleware to measure and log request processing time"""
@@ -130,13 +166,16 @@ async def add_process_time_header(request: Request, call_next):
     response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
     return response
 
+# Health-check body never changes; serialize it once at import
+HEALTH_BODY = orjson.dumps({"status": "online", "service": "QR ML Scanner"})
+
 @app.get("/")
 async def root():
     """Service health check endpoint"""
-    return {"status": "online", "service": "QR ML Scanner"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
-@app.post("/predict")
-async def predict(request: QRRequest):
+@app.post("/predict", response_model=None)
+def predict(request: QRRequest):
     """Predict risk score for a QR code"""
     start = time.time()
     
@@ -178,8 +217,8 @@ async def predict(request: QRRequest):
     
     return result
 
-@app.post("/feedback")
-async def feedback(qr_text: str, is_scam: bool):
+@app.post("/feedback", response_model=None)
+def feedback(qr_text: str, is_scam: bool):
     """Process user feedback to improve the model"""
     features = extract_features(qr_text)
     
@@ -194,42 +233,74 @@ async def feedback(qr_text: str, is_scam: bool):
     
     return {"status": "model_updated", "shard": shard}
 
-@app.post("/batch_predict")
-async def batch_predict(requests: List[QRRequest]):
-    """Process a batch of QR codes together"""
-    results = []
+@app.post("/batch_predict", response_model=None)
+async def batch_predict(request: Request):
+    """Process a batch of QR codes together.
+
+    The payload is decoded straight from the body with orjson instead of
+    instantiating a pydantic model per item - for large batches that
+    validation loop dominated the request cost.
+    """
+    try:
+        body = orjson.loads(await request.body())
+        if isinstance(body, dict):
+            body = body.get("requests", [])
+        qr_texts = [item["qr_text"] if isinstance(item, dict) else str(item)
+                    for item in body]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        # Hand-rolled decoding means pydantic no longer rejects bad
+        # bodies for us; answer with an explicit client error instead of
+        # letting it bubble into the generic 500 handler
+        return ORJSONResponse(
+            {"error": "Invalid batch payload: expected a JSON list of "
+                      "{\"qr_text\": ...} items"},
+            status_code=400)
+    return await run_in_threadpool(score_batch, qr_texts)
+
+def score_batch(qr_texts):
+    """Score a list of QR payloads (runs on the threadpool)"""
     start = time.time()
-    
-    for req in requests:
-        # Check cache
-        if req.qr_text in cache:
-            results.append({**cache[req.qr_text], "cached": True})
-            continue
-        
-        # Generate features
-        features = extract_features(req.qr_text)
-        proba = model.predict_proba_one(features).get(1, 0.0)
-        
-        # Apply business rules
-        if features['suspicious_keywords'] > 2:
-            proba = min(proba + 0.3, 1.0)
-        
-        result = {
-            "qr_text": req.qr_text,
-            "risk_score": round(proba * 100, 2),
-            "risk_level": "High" if proba > 0.7 else "Medium" if proba > 0.3 else "Low",
-            "features": features,
-            "cached": False
-        }
-        
-        # Cache result
-        if features['has_upi']:
-            cache.set(req.qr_text, result, expire=300)
-            
-        results.append(result)
-    
+    results = [None] * len(qr_texts)
+
+    # Split cache hits from items that still need scoring
+    pending = []
+    for i, qr_text in enumerate(qr_texts):
+        if qr_text in cache:
+            results[i] = {**cache[qr_text], "cached": True}
+        else:
+            pending.append((i, qr_text, extract_features(qr_text)))
+
+    if pending:
+        probas = np.empty(len(pending))
+        for j, (_, _, features) in enumerate(pending):
+            proba = model.predict_proba_one(features).get(1, 0.0)
+
+            # Apply business rules
+            if features['suspicious_keywords'] > 2:
+                proba = min(proba + 0.3, 1.0)
+            probas[j] = proba
+
+        # One vectorized rounding pass instead of a Python round() per item
+        scores = np.round(probas * 100, 2)
+
+        for j, (i, qr_text, features) in enumerate(pending):
+            proba = probas[j]
+            result = {
+                "qr_text": qr_text,
+                "risk_score": float(scores[j]),
+                "risk_level": "High" if proba > 0.7 else "Medium" if proba > 0.3 else "Low",
+                "features": features,
+                "cached": False
+            }
+
+            # Cache result
+            if features['has_upi']:
+                cache.set(qr_text, result, expire=300)
+
+            results[i] = result
+
     batch_time = (time.time() - start) * 1000
-    average_time = batch_time / len(requests) if requests else 0
+    average_time = batch_time / len(qr_texts) if qr_texts else 0
     
     return {
         "results": results,
@@ -255,8 +326,7 @@ async def generic_exception_handler(request, exc):
             risk_score = 80  # High risk for invalid UPI format
         else:
             # Check for suspicious signs
-            suspicious_count = sum(1 for kw in ['urgent', 'payment', 'offer'] 
-                                  if kw in qr_text.lower())
+            suspicious_count = count_suspicious_keywords(qr_text.lower())
             risk_score = min(30 + suspicious_count * 20, 100)
     
     return {
@@ -267,4 +337,17 @@ async def generic_exception_handler(request, exc):
     }
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    import uvicorn
+
+    # App passed by import string so uvicorn can fork multiple workers;
+    # uvloop + httptools give ~10% each over the default loop/parser.
+    uvicorn.run(
+        "qr_scan_ml_service:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.environ.get("WORKERS", os.cpu_count() or 1)),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+    )
\ No newline at end of file
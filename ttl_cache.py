@@ -0,0 +1,42 @@
+"""
+Shared in-process cache for the QR services: bounded LRU with a TTL.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLLRUCache:
+    """Bounded LRU cache whose entries expire after a fixed TTL.
+
+    Lock-guarded because the services read and write it from multiple
+    threads (Flask workers, FastAPI threadpool handlers).
+    """
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry"""
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)